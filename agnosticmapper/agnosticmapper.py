@@ -30,11 +30,15 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 __author__      = "Jannis Grundmann (Leibniz-Institut für Werkstofforientierte Technologien - IWT), Robert Heimsoth (DECOIT GmbH & Co. KG)"
 
 import os, sys
+import hashlib
+import itertools
 from uuid import uuid4
 import rdflib
+from rdflib.namespace import RDFS, SKOS
 import argparse
 import json
 from typing import Union
+from pathlib import Path
 
 
 def gen_uuid() -> str:
@@ -44,21 +48,7 @@ def gen_uuid() -> str:
     ------
     str: A new UUID
     """
-    return str(uuid4()).replace("-", "")
-
-incrementalInt = 0
-def get_incremental_int() -> int:
-    """Gets a new unique integer within this program session
-
-    This method uses the global variable incrementalInt for storing the last value.
-
-    Returns
-    ------
-    int: Unique integer
-    """
-    global incrementalInt
-    incrementalInt += 1
-    return incrementalInt
+    return uuid4().hex
 
 primitive = (bool, int, float, str)
 def is_primitive(element: object) -> bool:
@@ -83,7 +73,44 @@ class Mapper:
     in the given ontology terminologies.
     """
 
-    def map(self, canon: Union[list[dict], dict], ontos: list[str], context: dict, entityContextTuple: tuple, ignoreEntityInstantiationList: list[str]) -> str:
+    def __init__(self) -> None:
+        self.ontosHash = None # Hash of the ontologies the current graph and labelmaps are created from
+
+    def preload_ontologies(self, ontos: list[str]) -> None:
+        """Parses the given ontology terminologies into a rdflib Graph and creates the labelmaps used to resolve the labels.
+
+        The result is kept in the Mapper instance and reused by later calls of map(...) with the same ontologies,
+        so the ontologies are only parsed again if they are changed.
+        Can be called in advance to have the ontologies loaded before the first call of map(...).
+
+        Parameters
+        ------
+        ontos: list[str]
+            List of ontology terminologies as strings which are used to resolve the labels
+
+        Returns
+        ------
+        None
+        """
+        ontosHash = hashlib.blake2b(b"\0".join(onto.encode("utf-8") for onto in ontos), digest_size=16).digest()
+        if ontosHash == self.ontosHash:
+            return
+
+        # Invalidate the cached state first, so a failing parse is not reused by a later call
+        self.ontosHash = None
+
+        # Parse into a new graph, the current one is only replaced if all ontologies are parsed successfully
+        g = rdflib.Graph()
+        defaultNamespaces = [str(namespace) for _, namespace in g.namespaces()]
+        [g.parse(data=data) for data in ontos]
+        self.g = g
+        self.defaultNamespaces = defaultNamespaces
+        self.__create_labelmaps()
+        # IRI of the label used for the instances, resolved once because it is needed for every instance
+        self.labelIri = self.__get_class_by_label("label", "http://www.w3.org/2000/01/rdf-schema#label")
+        self.ontosHash = ontosHash
+
+    def map(self, canon: Union[list[dict], dict], ontos: list[str], context: dict, entityContextTuple: tuple, ignoreEntityInstantiationList: list[str], serializeFormat: str = "turtle") -> str:
         """Maps the given canonical json to Turtle. Based on provided ontology terminologies.
         Instantiates classes by its labels with a uuid and using the given entity context as namespace
 
@@ -101,10 +128,14 @@ class Mapper:
         ignoreEntityInstantiationList: list[str]
             List of strings which are the labels that will be not resolved to the full IRIs.
             Instead keeps the associated value as it is in the given canonical json.
+        serializeFormat, optional: str
+            Output format as name of a rdflib serializer, e.g. "turtle", "longturtle" or "nt" (defaults to "turtle").
+            For large outputs "nt" is considerably faster, because it writes every triple on its own line
+            and skips grouping the triples by subject and shortening the IRIs with prefixes as done for Turtle.
 
         Returns
         ------
-        str: Converted Turtle output
+        str: Converted output in the given serializeFormat (Turtle by default)
 
         Raises
         ------
@@ -115,23 +146,23 @@ class Mapper:
         """
         self.canon = canon
         
-        #Parse uploaded ontologies into a rdflib Graph
-        self.g = rdflib.Graph()
-        default_namespaces = [str(namespace) for _, namespace in self.g.namespaces()]
-        [self.g.parse(data=data) for data in ontos]
+        #Parse uploaded ontologies into a rdflib Graph, if they are not already loaded
+        self.preload_ontologies(ontos)
         # get context from graph
-        self.context = {prefix: namespace for prefix, namespace in self.g.namespaces() if str(namespace) not in default_namespaces and "default" not in str(prefix) and prefix}
+        self.context = {prefix: namespace for prefix, namespace in self.g.namespaces() if str(namespace) not in self.defaultNamespaces and "default" not in str(prefix) and prefix}
         if context:  # manual addition
             self.context.update(context)
         self.entityContextTuple = entityContextTuple
         if len(entityContextTuple) != 2:
             raise Exception("Entity Context must be a Tuple of 2 columns")
         self.context[entityContextTuple[0]] = entityContextTuple[1]
-        self.__create_labelmaps()
-        self.ignoreEntityInstantiationList = ignoreEntityInstantiationList
+        # Stored as set for fast lookups of the labels
+        self.ignoreEntityInstantiationList = frozenset(ignoreEntityInstantiationList)
+        self.serializeFormat = serializeFormat
+        # Unique integers for the generated identifiers within this mapping
+        self.incrementalInts = itertools.count(1)
         self.__create_entity_instation_entity_list()
         self.__create_jsonld_instances()
-        self.__apply_namespaces()
         self.__apply_uuids()
         return self.__serialize_graph()
     
@@ -141,9 +172,7 @@ class Mapper:
         Returns:
             None
         """
-        self.ignoreEntityInstantiationEntityList = []
-        for elem in self.ignoreEntityInstantiationList:
-            self.ignoreEntityInstantiationEntityList.append(self.__get_class_by_label(elem, elem))
+        self.ignoreEntityInstantiationEntityList = frozenset(self.__get_class_by_label(elem, elem) for elem in self.ignoreEntityInstantiationList)
 
     def __get_class_by_label(self, label: str, default: str = None) -> str:
         """Resolves a given label to a rdfs:label or skos:altlabel to its IRI based on the given language annotation.
@@ -185,26 +214,8 @@ class Mapper:
         if isinstance(label, list):
             return default
 
-        if label in self.altlabelmaps["en"]:
-            return self.altlabelmaps["en"][label]
-        if label in self.altlabelmaps["en-us"]:
-            return self.altlabelmaps["en-us"][label]
-        if label in self.altlabelmaps["en-gb"]:
-            return self.altlabelmaps["en-gb"][label]
-        if label in self.altlabelmaps["nolang"]:
-            return self.altlabelmaps["nolang"][label]
-        if label in self.labelmaps["en"]:
-            return self.labelmaps["en"][label]
-        if label in self.labelmaps["en-us"]:
-            return self.labelmaps["en-us"][label]
-        if label in self.labelmaps["en-gb"]:
-            return self.labelmaps["en-gb"][label]
-        if label in self.labelmaps["nolang"]:
-            return self.labelmaps["nolang"][label]
-        if label in self.altlabelmaps["de"]:
-            return self.altlabelmaps["de"][label]
-        if label in self.labelmaps["de"]:
-            return self.labelmaps["de"][label]
+        if label in self.labelindex:
+            return self.labelindex[label]
 
         if not default:
             raise Exception(f"Error finding class for label {label}")
@@ -232,275 +243,231 @@ class Mapper:
         self.altlabelmaps["nolang"] = {}
         self.altlabelmaps["de"] = {}
 
-        # Create maps for labels
-        labels_query = f"""
-                SELECT DISTINCT  ?lbl ?cls (lang(?lbl) as ?lang)
-                WHERE {{
-                    ?cls rdfs:label ?lbl .
-                    }}
-                """
-        query = self.g.query(labels_query)
-        for row in query:
-            lbl = str(row["lbl"])
-            cls = str(row["cls"])
-            lang = str(row["lang"])
-            if not lang:
-                lang = "nolang"
-            # If the lang is not used before, create a new entry for the lang for possible later use
-            if lang not in self.labelmaps:
-                self.labelmaps[lang] = {}
-            self.labelmaps[lang][lbl] = cls
-
-        # Create maps for skos alt-labels
-        altlabelsQuery = f"""
-                SELECT DISTINCT  ?lbl ?cls (lang(?lbl) as ?lang)
-                WHERE {{
-                    ?cls <http://www.w3.org/2004/02/skos/core#altLabel> ?lbl .
-                    }}
-                """
-        altquery = self.g.query(altlabelsQuery)
-        for row in altquery:
-            lbl = str(row["lbl"])
-            cls = str(row["cls"])
-            lang = str(row["lang"])
-            if not lang:
-                lang = "nolang"
-            # If the lang is not used before, create a new entry for the lang for possible later use
-            if lang not in self.altlabelmaps:
-                self.altlabelmaps[lang] = {}
-            self.altlabelmaps[lang][lbl] = cls
+        # Create maps for labels and skos alt-labels directly from the graph triples
+        for labelmaps, predicate in ((self.labelmaps, RDFS.label), (self.altlabelmaps, SKOS.altLabel)):
+            for cls, _, lbl in self.g.triples((None, predicate, None)):
+                # Only literals can carry a language annotation
+                if not isinstance(lbl, rdflib.Literal):
+                    continue
+                lang = lbl.language
+                if not lang:
+                    lang = "nolang"
+                # If the lang is not used before, create a new entry for the lang for possible later use
+                if lang not in labelmaps:
+                    labelmaps[lang] = {}
+                labelmaps[lang][str(lbl)] = str(cls)
+
+        # Flatten the labelmaps into a single index for the lookup in __get_class_by_label.
+        # Filled from the lowest to the highest priority, so that higher priority entries
+        # overwrite lower ones and the search order described there is kept.
+        self.labelindex = {} #{label : uri, ...}
+        for labelmap in (self.labelmaps["de"], self.altlabelmaps["de"],
+                         self.labelmaps["nolang"], self.labelmaps["en-gb"], self.labelmaps["en-us"], self.labelmaps["en"],
+                         self.altlabelmaps["nolang"], self.altlabelmaps["en-gb"], self.altlabelmaps["en-us"], self.altlabelmaps["en"]):
+            self.labelindex.update(labelmap)
 
     def __create_jsonld_instances(self) -> None:
         """Creates the list with the jsonld type dictionaries for each class instance of the given canonical json
-        
+
+        The labels used as keys are resolved to their IRI's while generating the jsonld dictionaries.
+        The canonical json is walked with an explicit stack instead of recursive calls.
+        The elements are handled in the same order as a depth-first recursion would do,
+        so the class instances of nested elements are added to the classMap before their parents.
+
         Returns:
             None
         """
         classMap = {}
+        getClassByLabel = self.__get_class_by_label
+
+        # The items on the stack are plain tuples of (action, container, slot, value, extra)
+        # "fill": Generates the jsonld element of the value and stores it in container[slot].
+        #         extra is True if the value is handled as jsonld ordered list
+        # "key": Handles the key slot with the value of the canonical json dictionary, container is the generated jsonld dictionary.
+        #         extra is the list of keys which should be handled as ordered list
+        # "instance": Completes the jsonld instance dictionary value with the identifier slot and adds it to the classMap.
+        #         extra is the holder of the generated jsonld element of the instance
+        stack = [("fill", [None], 0, self.canon, False)]
+        while stack:
+            action, container, slot, value, extra = stack.pop()
+
+            if action == "fill":
+                if isinstance(value, dict):
+                    tmp = {}
+                    container[slot] = tmp
+
+                    # Save the given keys which should be handled as ordered list for this dictionary
+                    tmpListHandler = []
+                    if "listHandler" in value.keys():
+                        tmpListHandler = value["listHandler"]
+
+                    # Pushed in reverse order, so that the keys are handled in their given order
+                    stack.extend([("key", tmp, key, val, tmpListHandler) for key, val in reversed(value.items())])
+                elif isinstance(value, list):
+                    # Check if all values are primitives (dataproperties)
+                    if all(is_primitive(val) for val in value):
+                        container[slot] = [{"@value": val} for val in value]
+                        continue
 
-        def __fill_class_map(iterable: Union[dict, list], isOrderedList: bool) -> None:
-            """Method that handles an entry of the given canonical json.
-            Method calls itself recursively and generates the jsonld dictionaries.
-
-            This method fills the non-local classMap variable.
-
-            Parameters
-            ------
-            iterable: Union[dict, list]
-                Iterable of dict or list which contains the element to generate its jsonld dictionary
-            isOrderedList: bool
-                If True all Lists are handled as jsonld ordered List elements, if False the list elements are unordered
-            
-            Returns
-            ------
-            dict: A jsonld instance dictionary
-            """
-            if isinstance(iterable, dict):
-                tmp = {}
+                    tmp = [None] * len(value)
+                    container[slot] = {"@list": tmp} if extra else tmp
+                    stack.extend([("fill", tmp, idx, value[idx], False) for idx in range(len(value) - 1, -1, -1)])
+
+            elif action == "key":
+                key = slot
+                tmp = container
+
+                # The value of hasIdentifier is always a string
+                if key == 'hasIdentifier':
+                    value = str(value)
+
+                # Ignore listHandler key, because it is used above
+                if key == 'listHandler':
+                    continue
+
+                if key[0].isupper() and isinstance(value, dict):
+                    # Generate the identifier either with the given hasIdentifier value 
+                    try:
+                        identifier = value.get(value["hasIdentifier"], value["hasIdentifier"])
+                        identifier = f"{key}_{identifier}"
+                    # if not possible use the key with an incremental value to make it unique
+                    except:
+                        identifier = f"{key}_{next(self.incrementalInts)}"
+
+                    # Save the identifier for this dictionary
+                    tmp["@id"] = identifier
+
+                    # Check if there are more keys than only hasIdentifier in the value dict
+                    if not value.keys() <= {"hasIdentifier"}:
+                        types = [getClassByLabel(key, "default")]
+
+                        # Additional types will be added with the resolved labels (object is type of multiple classes)
+                        if "additionalTypes" in value and isinstance(value["additionalTypes"], list):
+                            for additionalType in value["additionalTypes"]:
+                                if additionalType and additionalType.strip():
+                                    types.append(getClassByLabel(additionalType, additionalType))
+
+                        # Prepare JSON LD Format for that instance
+                        ldCls = {"@type": types, "@id": identifier}
+
+                        # Add the identifier as a unique label for later access in a different canon
+                        ldCls[self.labelIri] = key
+
+                        # Generate the jsonld element of the value first and complete the instance afterwards
+                        subClassMap = [None]
+                        stack.append(("instance", None, identifier, ldCls, subClassMap))
+                        stack.append(("fill", subClassMap, 0, value, False))
+                elif key[0].islower() and isinstance(value, dict):
+                    # Save the identifier for this iteration as sub identifier
+                    identifier = f"{key}_sub_{next(self.incrementalInts)}"
+                    tmp[getClassByLabel(key, key)] = {"@id": identifier}
+                elif isinstance(value, list):
+                    # Handle the list elements in further iterations
+                    stack.append(("fill", tmp, getClassByLabel(key, key), value, key in extra))
+                elif not key == "hasIdentifier" and not isinstance(value, dict):
+                    # If the value of that key should not be instantiated as own instance later
+                    # e.g. for qudt units
+                    if key in self.ignoreEntityInstantiationList:
+                        value = {
+                            "@id": getClassByLabel(value, value)
+                        }
+                    tmp[getClassByLabel(key, key)] = value
+
+            elif action == "instance":
+                identifier = slot
+                ldCls = value
+
+                for k, v in extra[0].items():
+                    # Add all keys except the identifier
+                    if not k == "hasIdentifier":
+                        ldCls[k] = v
+
+                # Add to the classMap
+                existing = classMap.get(identifier)
+                if existing is None:
+                    classMap[identifier] = ldCls
+                else:
+                    # Merge a later encounter of the same instance into the entry of the classMap,
+                    # keys that are not present yet are added and types are combined,
+                    # values of already present keys are kept from the first encounter
+                    for k, v in ldCls.items():
+                        if k not in existing:
+                            existing[k] = v
+                        elif k == "@type":
+                            for t in v:
+                                if t not in existing[k]:
+                                    existing[k].append(t)
 
-                # Save the given keys which should be handled as ordered list for this iteration
-                tmpListHandler = []
-                if "listHandler" in iterable.keys():
-                    tmpListHandler = iterable["listHandler"]
+        # Convert the classMap into a list of all values in it, because the keys are not relevant for further handling
+        self.classList = [v for v in classMap.values()]
 
-                for key, value in iterable.items():
-                    # The value of hasIdentifier is always a string
-                    if key == 'hasIdentifier':
-                        value = str(value)
+    def __apply_uuids(self) -> None:
+        """Applies unique IDs to all jsonld instances that are not in the given ignoreEntityInstantiationEntityList
 
-                    # Ignore listHandler key, because it is used above
-                    if key == 'listHandler':
-                        continue
+        The jsonld instances are walked with an explicit stack instead of recursive calls
+        and a unique ID is generated for every instance, except the labels that are given in ignoreEntityInstantiationEntityList.
+        The jsonld instances are changed in place.
 
-                    cls = self.__get_class_by_label(key, "default")
-
-                    if key[0].isupper() and isinstance(value, dict):
-                        # Generate the identifier either with the given hasIdentifier value 
-                        try:
-                            identifier = value.get(value["hasIdentifier"], value["hasIdentifier"])
-                            identifier = f"{key}_{identifier}"
-                        # if not possible use the key with an incremental value to make it unique
-                        except:
-                            identifier = f"{key}_{get_incremental_int()}"
-
-                        # Check if there are more keys than only hasIdentifier in the value dict
-                        if not all([k == "hasIdentifier" for k in value.keys()]):
-                            types = [cls]
-
-                            # Additional types will be added with the resolved labels (object is type of multiple classes)
-                            if isinstance(value, dict) and "additionalTypes" in value and isinstance(value["additionalTypes"], list):
-                                for additionalType in value["additionalTypes"]:
-                                    if additionalType and additionalType.strip():
-                                        types.append(self.__get_class_by_label(additionalType, additionalType))
-
-                            # Prepare JSON LD Format for that instance
-                            ldCls = {"@type": types, "@id": identifier}
-                            
-                            # Add the identifier as a unique label for later access in a different canon
-                            ldCls[self.__get_class_by_label("label", "http://www.w3.org/2000/01/rdf-schema#label")] = key
-                            
-                            # Call method again recursively for the value
-                            subClassMap = __fill_class_map(value, False)
-
-                            for k, v in subClassMap.items():
-                                # Add all keys except the identifier
-                                if not k == "hasIdentifier":
-                                    ldCls[k] = v
-
-                            # Add to the classMap
-                            if identifier not in classMap.keys():
-                                classMap[identifier] = ldCls
-                            else:
-                                # Update the entry in the classMap if there are more keys available
-                                if len(ldCls) > len(classMap[identifier]):
-                                    # update class_map entry if more keyvalues are present in later encounter
-                                    classMap[identifier].update(ldCls)
-                        
-                        # Save the identifier for this iteration
-                        tmp["@id"] = identifier
-                    elif key[0].islower() and isinstance(value, dict):
-                        # Save the identifier for this iteration as sub identifier
-                        identifier = f"{key}_sub_{get_incremental_int()}"
-                        tmp[key] = {"@id": identifier}
-                    elif isinstance(value, list):
-                        # Calling subs recursiveley
-                        tmp[key] = __fill_class_map(value, key in tmpListHandler)
-                    elif not key == "hasIdentifier" and not isinstance(value, dict) and not isinstance(value, list):
-                        # If the value of that key should not be instantiated as own instance later
-                        # e.g. for qudt units
-                        if key in self.ignoreEntityInstantiationList:
-                            value = {
-                                "@id": self.__get_class_by_label(value, value)
-                            }
-                        tmp[key] = value
-                return tmp
-            elif isinstance(iterable, list):
-                # Check if all values are primitives (dataproperties)
-                if all([is_primitive(val) for val in iterable]): 
-                    vals = [{"@value": val} for val in iterable]
-                    return vals
-                
-                tmp = list(range(len(iterable)))
-                for idx, elem in enumerate(iterable):
-                    tmp[idx] = __fill_class_map(elem, False)
-
-                if isOrderedList:
-                    return {"@list": tmp}
-                
-                return tmp
-
-        __fill_class_map(self.canon, False)
-        # Convert the classMap into a list of all values in it, because the keys are not relevant for further handling
-        self.classList = [v for v in classMap.values()]
+        Generated labels are in format "ClassName ShortUUID"
 
-    def __apply_namespaces(self) -> None:
-        """Set the namespaces for the jsonld instances by resolving the Labels to its IRI's
-        
         Returns:
             None
         """
-
-        def __set_namespaces(iterable: Union[dict, list]) -> dict:
-            """Method that handles an entry of the given jsonld instances.
-            Method calls itself recursively and resolves the given Labels to their corresponding IRI's.
-
-            Parameters
-            ------
-            iterable: Union[dict, list]
-                Iterable of dict or list which contains the element to generate its IRI's
-
-            Returns
-            ------
-            dict: The dictionary with the resolved namespace
-            """
-            if isinstance(iterable, dict):
-                tmp = {}
-                for key, value in iterable.items():
-                    if key == "@id":
-                        tmp[key] = value
-                    if key == "@type":
-                        tmp[key] = self.__get_class_by_label(value, value)
-                    elif isinstance(value, list):
-                        tmp[self.__get_class_by_label(key, key)] = __set_namespaces(value)
-                    elif key == "@value":
-                        return {"@value": value}
-                    elif key != "@type" and key != "@id":
-                        tmp[self.__get_class_by_label(key, key)] = value
-                return tmp
-            elif isinstance(iterable, list):
-                tmp = []
-                for elem in iterable:
-                    tmp.append(__set_namespaces(elem))
-                return tmp
-
-        self.classList = __set_namespaces(self.classList)
-
-    def __apply_uuids(self) -> None:
-        """Applies unique IDs to all jsonld instances that are not in the given ignoreEntityInstantiationEntityList"""
         # apply pmde uuids and units
         idMap = {}
-        def __set_uuid(iterable: Union[dict, list], parentKey: str) -> None:
-            """Method that handles an entry of the given jsonld instances.
-            Method calls itself recursively and generates a unique ID for every instance,
-            except the labels that are given in ignoreEntityInstantiationEntityList.
-
-            This method fills the non-local idMap with the jsonld instances with the generated UUIDs.
-
-            Generated labels are in format UUID_ClassName_IterationNumber
+        entityIri = self.entityContextTuple[1]
+        entityIriLength = len(entityIri)
+        labelIri = self.labelIri
 
-            Parameters
-            ------
-            iterable: Union[dict, list]
-                Iterable of dict or list which contains the element to generate their UUIDs
-            parentKey: str
-                The parent key of the previous iteration
+        # The items on the stack are plain tuples of (iterable, parentKey)
+        # where parentKey is the key of the dict that contains the iterable, None for list elements
+        stack = [(self.classList, None)]
+        while stack:
+            iterable, parentKey = stack.pop()
 
-            Returns:
-                None
-            """
             if isinstance(iterable, dict):
+                children = []
                 for key, value in iterable.items():
                     if key == "@id" and parentKey not in self.ignoreEntityInstantiationEntityList:
-                        uuid = gen_uuid()
                         if value not in idMap:
                             if value.startswith(self.entityContextTuple[0]+":"):
                                 idMap[value] = value
                             else:
-                                idMap[value] = f"{self.entityContextTuple[1]}{uuid}"
-                        iterable[key] = idMap[value]
-                        if self.__get_class_by_label("label", "http://www.w3.org/2000/01/rdf-schema#label") in iterable:
+                                idMap[value] = f"{entityIri}{gen_uuid()}"
+                        entityId = idMap[value]
+                        iterable[key] = entityId
+                        if labelIri in iterable:
                             labelAppendix = value
                             if "http://www.w3.org/2000/01/rdf-schema#label" in iterable:
                                 labelAppendix = iterable["http://www.w3.org/2000/01/rdf-schema#label"]
-                            shortid = idMap[value].replace(self.entityContextTuple[1], "")[:4]
-                            iterable[self.__get_class_by_label("label", "http://www.w3.org/2000/01/rdf-schema#label")] = f"{labelAppendix} {shortid}"
+                            # Take the first characters of the id behind the entity context
+                            if entityId.startswith(entityIri):
+                                shortid = entityId[entityIriLength:entityIriLength+4]
+                            else:
+                                shortid = entityId[:4]
+                            iterable[labelIri] = f"{labelAppendix} {shortid}"
                     elif isinstance(value, list) or isinstance(value, dict):
-                        __set_uuid(value, key)
+                        children.append((value, key))
+                # Pushed in reverse order, so that the elements are handled in their given order
+                stack.extend(reversed(children))
             elif isinstance(iterable, list):
-                for elem in iterable:
-                    __set_uuid(elem, None)
-
-        __set_uuid(self.classList, None)
-
-        # apply context
-        for elem in self.classList:
-            elem["@context"] = self.context
+                stack.extend([(elem, None) for elem in reversed(iterable)])
 
     def __serialize_graph(self) -> str:
-        """This method serializes the generated json-ld instances to the Turtle format
+        """This method serializes the generated json-ld instances to the given serializeFormat (Turtle by default)
         
         Returns
         ------
-        str: The serialized Turtle of the generated json-ld based on the given canonical json
+        str: The serialized output of the generated json-ld based on the given canonical json
         """
         gData = rdflib.Graph()
 
-        # save as jsonlds and parse into graph
-        for elem in self.classList:
-            gData.parse(data=elem, format='json-ld')
+        # save as a single jsonld document with a shared context and parse it into the graph at once
+        # the document is handed over as dict, so rdflib reads it without an intermediate json string
+        gData.parse(data={"@context": self.context, "@graph": self.classList}, format='json-ld')
 
-        # save onto as ttl (as  as output)
-        return gData.serialize(format='turtle')
+        # save onto in the given format (ttl by default) as output
+        return gData.serialize(format=self.serializeFormat)
 
 
 
@@ -510,11 +477,11 @@ def example():
     import os
 
     mapper = Mapper()
-    ontos = [open(file, "r").read() for file in
+    ontos = [Path(file).read_text(encoding="utf-8") for file in
              [f"./example/foaf.ttl", f"./example/rdf-schema.ttl",
               f"./example/dublin_core_terms.ttl"]]
 
-    canon_json = json.loads(open(f"./example/foaf_canon.json", "r").read())
+    canon_json = json.loads(Path(f"./example/foaf_canon.json").read_bytes())
 
     context = {
         "foaf": "http://xmlns.com/foaf/0.1",
@@ -548,13 +515,14 @@ if __name__=="__main__":
     parser.add_argument('-e','--entitycontext', action='store', dest='entity_context', help="Entity Context (e.g. https://example.org/entity/)", required=True)
     parser.add_argument('-i','--ignoreinstantiation', action='append', dest='ignore_instantiation', help='List of Labels which are not instantiated with entity context (e.g. interest) (Multiple possible)', required=False)
     parser.add_argument('-w','--writefilepath', action='store', dest='write_path', help='Write generated Turtle to the given file instead of print it. (e.g. /tmp/test.ttl)', required=False)
+    parser.add_argument('-f','--format', action='store', dest='serialize_format', default='turtle', help='Output format of the rdflib serializer (e.g. turtle, longturtle, nt), defaults to turtle', required=False)
 
     args = parser.parse_args()
 
-    ontos = [open(file, "r").read() for file in args.ontos] 
-    canon_json = json.loads(open(f"{args.canon_json}", "r").read())
+    ontos = [Path(file).read_text(encoding="utf-8") for file in args.ontos]
+    canon_json = json.loads(Path(args.canon_json).read_bytes())
 
-    context = json.loads(open(f"{args.context}", "r").read())
+    context = json.loads(Path(args.context).read_bytes())
 
     entityContextTuple = (args.entity_context_prefix, args.entity_context)
 
@@ -572,7 +540,8 @@ if __name__=="__main__":
                 ontos=ontos,
                 context=context,
                 entityContextTuple=entityContextTuple,
-                ignoreEntityInstantiationList=ignoreEntityInstantiationList)
+                ignoreEntityInstantiationList=ignoreEntityInstantiationList,
+                serializeFormat=args.serialize_format)
     
     if "write_path" in args and args.write_path:
         f = open(args.write_path, "w")